@@ -1,10 +1,14 @@
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
 import streamlit as st
 import pandas as pd
+import polars as pl
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-from scipy.stats import f_oneway, chi2_contingency
+import pyarrow as pa
+import pyarrow.compute as pc
+from scipy.stats import chi2_contingency, f as f_dist
 
 # Set page config
 st.set_page_config(
@@ -35,119 +39,253 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Columns actually used by the app - projecting the Parquet read down to these
+# roughly halves the bytes decoded from disk and the size of the cached frame
+USED_COLS = (
+    'lpep_pickup_datetime', 'lpep_dropoff_datetime', 'passenger_count',
+    'trip_distance', 'payment_type', 'trip_type', 'total_amount',
+    'extra', 'mta_tax', 'tip_amount', 'tolls_amount',
+    'improvement_surcharge', 'congestion_surcharge'
+)
+
+# Data locations are overridable via environment variables; the Feather file
+# caches the fully preprocessed frame so warm starts skip Parquet decoding
+# and all of the preprocessing below (Feather/IPC is mmap-friendly to read)
+PARQUET_PATH = os.environ.get("TAXI_PARQUET", "green_tripdata_2023-08.parquet")
+FEATHER_CACHE = Path(os.environ.get("TAXI_CACHE", "green_202308.feather"))
+
 # Load data function with caching
 @st.cache_data
-def load_data():
-    df = pd.read_parquet("green_tripdata_2023-08.parquet")
-    
-    # Preprocessing steps from notebook
-    df.drop(columns=['ehail_fee', 'fare_amount'], inplace=True, errors='ignore')
-    df['trip_duration'] = (df['lpep_dropoff_datetime'] - df['lpep_pickup_datetime']).dt.total_seconds() / 60
-    df['weekday'] = df['lpep_dropoff_datetime'].dt.day_name()
-    df['hourofday'] = df['lpep_dropoff_datetime'].dt.hour
-    
-    # Add week of month calculation
-    df['day_of_month'] = df['lpep_pickup_datetime'].dt.day
-    df['week_of_month'] = ((df['day_of_month'] - 1) // 7) + 1
-    df['week_name'] = df['week_of_month'].map({
-        1: "1st Week",
-        2: "2nd Week",
-        3: "3rd Week",
-        4: "4th Week",
-        5: "5th Week"  # In case the month has a partial 5th week
-    })
-    
-    df.fillna(df.median(numeric_only=True), inplace=True)
-    df.fillna(method='ffill', inplace=True)
+def load_data(filters=None):
+    if filters is None and FEATHER_CACHE.exists():
+        return pd.read_feather(FEATHER_CACHE)
+    df = _read_and_preprocess(filters)
+    if filters is None:
+        df.reset_index(drop=True).to_feather(FEATHER_CACHE, compression="zstd")
+    return df
+
+def _read_and_preprocess(filters=None):
+    # Read + datetime derivations go through Polars' lazy engine: projection
+    # (and any filter) is pushed down into the Parquet scan and the pipeline
+    # runs multithreaded on Arrow memory before handing a frame to pandas
+    lf = pl.scan_parquet(PARQUET_PATH).select(list(USED_COLS))
+    if filters is not None:
+        lf = lf.filter(filters)
+    lf = lf.with_columns(
+        ((pl.col('lpep_dropoff_datetime') - pl.col('lpep_pickup_datetime'))
+         .dt.total_seconds().cast(pl.Float32) / 60).alias('trip_duration'),
+        pl.col('lpep_dropoff_datetime').dt.to_string('%A').alias('weekday'),
+        pl.col('lpep_dropoff_datetime').dt.hour().alias('hourofday'),
+        pl.col('lpep_pickup_datetime').dt.day().alias('day_of_month'),
+    )
+    df = lf.collect().to_pandas(use_pyarrow_extension_array=True)
+
+    # Add week of month calculation: numpy arithmetic on the day-of-month
+    # array, with the codes reused directly as a compact categorical instead
+    # of a per-row dict .map producing an object column
+    day = df['day_of_month'].to_numpy()
+    week_codes = ((day - 1) // 7).astype(np.int8)  # 0..4
+    df['week_of_month'] = week_codes + 1
+    df['week_name'] = pd.Categorical.from_codes(
+        week_codes,
+        categories=["1st Week", "2nd Week", "3rd Week", "4th Week", "5th Week"]
+    )
     
-    # Map payment types to meaningful names
-    payment_mapping = {
-        1: "Credit Card",
-        2: "Cash",
-        3: "No Charge",
-    }
-    df['payment_type_name'] = df['payment_type'].map(payment_mapping)
+    # Fill nulls per-column rather than with a frame-wide median + ffill:
+    # only a few columns actually contain nulls, so this avoids computing
+    # medians for every numeric column and double-copying the whole frame
+    for c in df.columns[df.isna().any()]:
+        if pd.api.types.is_numeric_dtype(df[c]):
+            df[c] = df[c].fillna(df[c].median())
+        else:
+            df[c] = df[c].ffill()
     
+    # Map payment types to meaningful names by attaching category labels
+    # directly to the existing integer codes - no per-row dict lookup;
+    # unmapped codes (e.g. Dispute) become null, as .map produced before
+    payment_categories = ["Credit Card", "Cash", "No Charge"]
+    codes = df['payment_type'].to_numpy().astype(np.int8) - 1
+    codes[(codes < 0) | (codes >= len(payment_categories))] = -1
+    df['payment_type_name'] = pd.Categorical.from_codes(codes, categories=payment_categories)
+
     # Map trip types to meaningful names if column exists
     if 'trip_type' in df.columns:
-        trip_type_mapping = {
-            1: "Street-hail",
-            2: "Dispatch"
-        }
-        df['trip_type_name'] = df['trip_type'].map(trip_type_mapping)
-    
+        trip_categories = ["Street-hail", "Dispatch"]
+        codes = df['trip_type'].to_numpy().astype(np.int8) - 1
+        codes[(codes < 0) | (codes >= len(trip_categories))] = -1
+        df['trip_type_name'] = pd.Categorical.from_codes(codes, categories=trip_categories)
+
+    # Weekday gets a fixed Monday-Sunday category order, so code i always
+    # means the i-th day and charts never need a string reindex
+    df['weekday'] = pd.Categorical(
+        df['weekday'],
+        categories=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+        ordered=True
+    )
+
+    # Shrink dtypes: label columns become categoricals (int8 codes + small
+    # dictionary) and small-range integers are downcast, so the sidebar
+    # filter comparisons run on compact integer arrays instead of strings
+    for c in ['payment_type_name', 'week_name', 'trip_type_name']:
+        if c in df.columns:
+            df[c] = df[c].astype('category')
+    for c in ['passenger_count', 'hourofday', 'week_of_month', 'day_of_month', 'payment_type', 'trip_type']:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], downcast='integer')
+    df['trip_duration'] = df['trip_duration'].astype('float32')
+
     return df
 
 df = load_data()
 
-# Sidebar filters
+# Sidebar filters: grouped in a form so changing a widget doesn't rerun the
+# whole script - filters and plots recompute once per "Apply Filters" click
 st.sidebar.header("Filter Data")
 
-# Week selector (new filter)
 week_options = ["All Weeks", "1st Week", "2nd Week", "3rd Week", "4th Week", "5th Week"]
-selected_week = st.sidebar.selectbox(
-    "Select Week",
-    options=week_options,
-    index=0
-)
-
-# Weekday selector (single selection)
 weekday_options = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-selected_weekday = st.sidebar.selectbox(
-    "Select Weekday",
-    options=weekday_options,
-    index=0
-)
-
-# Payment type selector (single selection)
 payment_options = ["Credit Card", "Cash", "No Charge"]
-selected_payment = st.sidebar.selectbox(
-    "Select Payment Method",
-    options=payment_options,
-    index=0
-)
-
-# Passenger count selector (single selection)
 passenger_options = sorted(df['passenger_count'].unique().tolist())
-selected_passenger = st.sidebar.selectbox(
-    "Select Passenger Count",
-    options=passenger_options,
-    index=0
-)
+hour_options = sorted(df['hourofday'].unique().tolist())
 
-# Trip type selector (single selection) - if column exists
-if 'trip_type_name' in df.columns:
-    trip_type_options = ["Street-hail", "Dispatch"]
-    selected_trip_type = st.sidebar.selectbox(
-        "Select Trip Type",
-        options=trip_type_options,
+with st.sidebar.form("filters"):
+    # Week selector (new filter)
+    selected_week = st.selectbox(
+        "Select Week",
+        options=week_options,
         index=0
     )
 
-# Hour selector (single selection)
-hour_options = sorted(df['hourofday'].unique().tolist())
-selected_hour = st.sidebar.selectbox(
-    "Select Hour of Day",
-    options=hour_options,
-    index=0
-)
+    # Weekday selector (single selection)
+    selected_weekday = st.selectbox(
+        "Select Weekday",
+        options=weekday_options,
+        index=0
+    )
 
-# Apply filters
-filtered_df = df.copy()
+    # Payment type selector (single selection)
+    selected_payment = st.selectbox(
+        "Select Payment Method",
+        options=payment_options,
+        index=0
+    )
 
-# Apply week filter (new filter)
-if selected_week != "All Weeks":
-    filtered_df = filtered_df[filtered_df['week_name'] == selected_week]
+    # Passenger count selector (single selection)
+    selected_passenger = st.selectbox(
+        "Select Passenger Count",
+        options=passenger_options,
+        index=0
+    )
 
-# Apply other filters (single selection)
-filtered_df = filtered_df[filtered_df['weekday'] == selected_weekday]
-filtered_df = filtered_df[filtered_df['payment_type_name'] == selected_payment]
-filtered_df = filtered_df[filtered_df['passenger_count'] == selected_passenger]
+    # Trip type selector (single selection) - if column exists
+    if 'trip_type_name' in df.columns:
+        trip_type_options = ["Street-hail", "Dispatch"]
+        selected_trip_type = st.selectbox(
+            "Select Trip Type",
+            options=trip_type_options,
+            index=0
+        )
 
+    # Hour selector (single selection)
+    selected_hour = st.selectbox(
+        "Select Hour of Day",
+        options=hour_options,
+        index=0
+    )
+
+    st.form_submit_button("Apply Filters")
+
+# Apply filters: the filter combination has low cardinality (~6k bins), so a
+# one-time groupby pass builds a dict of row positions per combination and
+# every rerun becomes an O(1) lookup plus a single gather with df.take
+FILTER_COLS = ['week_name', 'weekday', 'payment_type_name', 'passenger_count', 'trip_type_name', 'hourofday']
+
+@st.cache_data
+def build_index(_df):
+    cols = [c for c in FILTER_COLS if c in _df.columns]
+    return _df.groupby(cols, observed=True).indices
+
+idx_map = build_index(df)
+
+key_tail = (selected_weekday, selected_payment, selected_passenger)
 if 'trip_type_name' in df.columns:
-    filtered_df = filtered_df[filtered_df['trip_type_name'] == selected_trip_type]
+    key_tail += (selected_trip_type,)
+key_tail += (selected_hour,)
+
+if selected_week == "All Weeks":
+    weeks = list(df['week_name'].cat.categories)
+else:
+    weeks = [selected_week]
+
+parts = [idx_map[(w,) + key_tail] for w in weeks if (w,) + key_tail in idx_map]
+idx = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+filtered_df = df.take(idx)
 
-filtered_df = filtered_df[filtered_df['hourofday'] == selected_hour]
+# Stable key for the current filter combination - cached helpers below key on
+# this small tuple instead of hashing the filtered frame itself, so they only
+# recompute when the filters actually change
+filter_key = (selected_week,) + key_tail
+
+@st.cache_data
+def sample_scatter(key, n):
+    return filtered_df.sample(min(n, len(filtered_df)), random_state=0)
+
+def cat_counts(col):
+    """Value counts for a categorical column via its int8 codes.
+
+    Hashing 1-byte codes is far cheaper than hashing the label strings;
+    -1 codes (nulls) are dropped, matching value_counts' default.
+    """
+    counts = col.cat.codes.value_counts()
+    counts = counts[counts.index >= 0]
+    counts.index = col.cat.categories[counts.index]
+    return counts
+
+def cat_histogram(col):
+    """Counts in fixed category order via np.bincount on the codes.
+
+    For columns whose category order is set at load time (weekday,
+    week_name) this is a single C-level pass with no hash table and no
+    string reindex afterwards; -1 codes (nulls) are dropped.
+    """
+    codes = col.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=col.cat.categories.size)
+    return pd.Series(counts, index=col.cat.categories)
+
+NUMERIC_COLS = ['trip_distance', 'extra', 'mta_tax', 'tip_amount', 'tolls_amount',
+                'improvement_surcharge', 'congestion_surcharge', 'trip_duration',
+                'passenger_count', 'total_amount']
+
+@st.cache_data
+def aggregates(key):
+    """All per-tab aggregations of the filtered frame in one cached pass.
+
+    Tabs read these small precomputed series/frames, so switching tabs or
+    rerunning with unchanged filters never reaggregates the filtered rows.
+    """
+    return SimpleNamespace(
+        weekday_counts=cat_histogram(filtered_df['weekday']),
+        hour_counts=filtered_df['hourofday'].value_counts().sort_index(),
+        week_counts=cat_histogram(filtered_df['week_name']),
+        payment_counts=cat_counts(filtered_df['payment_type_name']),
+        trip_counts=(cat_counts(filtered_df['trip_type_name'])
+                     if 'trip_type_name' in filtered_df.columns else None),
+        avg_amount_by_weekday=filtered_df.groupby('weekday', observed=True)['total_amount'].mean().reindex(weekday_options),
+        avg_amount_by_week=filtered_df.groupby('week_name', observed=True)['total_amount'].mean().reindex(week_options[1:]),
+        corr=filtered_df[NUMERIC_COLS].corr(),
+    )
+
+agg = aggregates(filter_key)
+
+# Arrow copy of the columns the statistical tests read: filtering it with
+# pyarrow.compute kernels runs SIMD-vectorized C++ over the dictionary
+# columns, and only the much smaller filtered result goes back to pandas
+TEST_COLS = ['total_amount', 'weekday', 'payment_type_name', 'week_name', 'trip_type_name']
+
+@st.cache_data
+def build_test_table(_df):
+    cols = [c for c in TEST_COLS if c in _df.columns]
+    return pa.Table.from_pandas(_df[cols], preserve_index=False)
 
 # Main content
 st.title("🚕 NYC Green Taxi Trip Analysis - August 2023")
@@ -169,13 +307,18 @@ st.header("Data Visualizations")
 tab1, tab2, tab3, tab4 = st.tabs(["Trip Patterns", "Financial Analysis", "Statistical Tests", "Raw Data"])
 
 with tab1:
+    # Plotly is ~300 ms of import time; deferring it past the metrics row
+    # speeds up cold start (repeat imports just hit sys.modules)
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     st.subheader("Trip Patterns by Time")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Trips by weekday
-        weekday_counts = filtered_df['weekday'].value_counts().reindex(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+        weekday_counts = agg.weekday_counts
         fig = px.bar(
             weekday_counts,
             title="Trips by Weekday",
@@ -187,33 +330,49 @@ with tab1:
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        # Trips by hour
-        hour_counts = filtered_df['hourofday'].value_counts().sort_index()
-        fig = px.line(
-            hour_counts,
+        # Trips by hour - WebGL line on the pre-aggregated counts
+        hour_counts = agg.hour_counts
+        fig = go.Figure(go.Scattergl(
+            x=hour_counts.index.to_numpy(),
+            y=hour_counts.to_numpy(),
+            mode='lines+markers'
+        ))
+        fig.update_layout(
             title="Trips by Hour of Day",
-            labels={'index': 'Hour of Day', 'value': 'Number of Trips'},
-            markers=True
+            xaxis_title="Hour of Day",
+            yaxis_title="Number of Trips"
         )
         st.plotly_chart(fig, use_container_width=True)
-    
-    # Trip duration vs distance
+
+    # Trip duration vs distance - Scattergl renders the markers on the GPU,
+    # one trace per observed weekday to keep the categorical legend
     st.subheader("Trip Duration vs Distance")
-    sample_df = filtered_df.sample(min(1000, len(filtered_df)))  # Sample for performance
-    fig = px.scatter(
-        sample_df,
-        x='trip_distance',
-        y='trip_duration',
-        color='weekday',
+    sample_df = sample_scatter(filter_key, 1000)  # Sample for performance
+    weekday_codes = sample_df['weekday'].cat.codes.to_numpy()
+    fig = go.Figure()
+    for code, day_name in enumerate(sample_df['weekday'].cat.categories):
+        pts = weekday_codes == code
+        if not pts.any():
+            continue
+        fig.add_trace(go.Scattergl(
+            x=sample_df['trip_distance'].to_numpy()[pts],
+            y=sample_df['trip_duration'].to_numpy()[pts],
+            mode='markers',
+            name=day_name,
+            customdata=sample_df['total_amount'].to_numpy()[pts],
+            hovertemplate=('Distance: %{x} miles<br>Duration: %{y} mins<br>'
+                           'Total: $%{customdata:.2f}<extra>' + day_name + '</extra>')
+        ))
+    fig.update_layout(
         title="Trip Duration vs Distance",
-        labels={'trip_distance': 'Distance (miles)', 'trip_duration': 'Duration (minutes)'},
-        hover_data=['total_amount']
+        xaxis_title="Distance (miles)",
+        yaxis_title="Duration (minutes)"
     )
     st.plotly_chart(fig, use_container_width=True)
 
     # Add a new visualization for trips by week
     st.subheader("Trips by Week of Month")
-    week_counts = filtered_df['week_name'].value_counts().sort_index()
+    week_counts = agg.week_counts
     fig = px.bar(
         week_counts,
         title="Trip Distribution by Week of Month",
@@ -225,13 +384,15 @@ with tab1:
     st.plotly_chart(fig, use_container_width=True)
 
 with tab2:
+    import plotly.express as px
+
     st.subheader("Financial Analysis")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Payment type distribution
-        payment_counts = filtered_df['payment_type_name'].value_counts()
+        payment_counts = agg.payment_counts
         fig = px.pie(
             payment_counts,
             values=payment_counts.values,
@@ -244,7 +405,7 @@ with tab2:
     with col2:
         # Trip type distribution
         if 'trip_type_name' in filtered_df.columns:
-            trip_counts = filtered_df['trip_type_name'].value_counts()
+            trip_counts = agg.trip_counts
             fig = px.pie(
                 trip_counts,
                 values=trip_counts.values,
@@ -256,7 +417,7 @@ with tab2:
     
     # Average total amount by weekday
     st.subheader("Average Total Amount by Weekday")
-    avg_amount = filtered_df.groupby('weekday')['total_amount'].mean().reindex(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+    avg_amount = agg.avg_amount_by_weekday
     fig = px.bar(
         avg_amount,
         title="Average Total Amount by Weekday",
@@ -269,7 +430,7 @@ with tab2:
     
     # New visualization: Average total amount by week of month
     st.subheader("Average Total Amount by Week")
-    avg_amount_by_week = filtered_df.groupby('week_name')['total_amount'].mean().reindex(["1st Week", "2nd Week", "3rd Week", "4th Week", "5th Week"])
+    avg_amount_by_week = agg.avg_amount_by_week
     fig = px.bar(
         avg_amount_by_week,
         title="Average Total Amount by Week of Month",
@@ -282,10 +443,7 @@ with tab2:
     
     # Correlation heatmap
     st.subheader("Correlation Heatmap")
-    numeric_cols = ['trip_distance', 'extra', 'mta_tax', 'tip_amount', 'tolls_amount', 
-                   'improvement_surcharge', 'congestion_surcharge', 'trip_duration', 
-                   'passenger_count', 'total_amount']
-    corr = filtered_df[numeric_cols].corr()
+    corr = agg.corr
     fig = px.imshow(
         corr,
         text_auto=True,
@@ -316,15 +474,46 @@ with tab3:
             ['All'] + week_options[1:]  # Skip the "All Weeks" option
         )
     
-    # Apply selected filters
-    test_df = df.copy()
-    if test_weekday != 'All':
-        test_df = test_df[test_df['weekday'] == test_weekday]
-    if test_payment != 'All':
-        test_df = test_df[test_df['payment_type_name'] == test_payment]
-    if test_week != 'All':
-        test_df = test_df[test_df['week_name'] == test_week]
-    
+    # Apply selected filters on the Arrow table - no full-frame df.copy()
+    # and no intermediate pandas frame per predicate
+    test_table = build_test_table(df)
+    test_mask = None
+    for col, choice in (('weekday', test_weekday),
+                        ('payment_type_name', test_payment),
+                        ('week_name', test_week)):
+        if choice != 'All':
+            cond = pc.equal(test_table[col], choice)
+            test_mask = cond if test_mask is None else pc.and_(test_mask, cond)
+    if test_mask is not None:
+        test_table = test_table.filter(test_mask)
+    test_df = test_table.to_pandas()
+
+    # One-way ANOVA straight from the category codes: a single bincount pass
+    # accumulates per-group counts, sums and sums of squares - no groupby and
+    # no list of per-group arrays at all
+    test_totals = test_df['total_amount'].to_numpy()
+
+    def anova_by_code(col):
+        codes = test_df[col].cat.codes.to_numpy()
+        n_cats = test_df[col].cat.categories.size
+        valid = codes >= 0
+        v = test_totals[valid]
+        c = codes[valid]
+        cnt = np.bincount(c, minlength=n_cats)
+        sums = np.bincount(c, weights=v, minlength=n_cats)
+        sqs = np.bincount(c, weights=v * v, minlength=n_cats)
+        nonempty = cnt > 0
+        k = int(nonempty.sum())
+        n = int(cnt.sum())
+        if k < 2 or n <= k:
+            return np.nan, np.nan, k
+        group_ss = (sums[nonempty] ** 2 / cnt[nonempty]).sum()
+        ss_between = group_ss - sums.sum() ** 2 / n
+        ss_within = sqs.sum() - group_ss
+        f_stat = (ss_between / (k - 1)) / (ss_within / (n - k))
+        p_value = f_dist.sf(f_stat, k - 1, n - k)
+        return f_stat, p_value, k
+
     st.markdown("""
     ### ANOVA Tests
     These tests examine whether there are statistically significant differences in means between groups.
@@ -332,10 +521,9 @@ with tab3:
     
     # ANOVA: total_amount ~ trip_type
     if 'trip_type_name' in test_df.columns:
-        trip_type_groups = [g['total_amount'] for _, g in test_df.groupby('trip_type_name')]
+        f_stat, p_value, n_trip_groups = anova_by_code('trip_type_name')
         
-        if len(trip_type_groups) >= 2 and all(len(group) > 0 for group in trip_type_groups):
-            f_stat, p_value = f_oneway(*trip_type_groups)
+        if n_trip_groups >= 2:
             st.markdown(f"""
             **Total Amount by Trip Type**
             - F-statistic: {f_stat:.2f}
@@ -346,10 +534,9 @@ with tab3:
             st.warning("Cannot perform ANOVA test on trip types - need at least 2 groups with data")
     
     # ANOVA: total_amount ~ weekday
-    weekday_groups = [g['total_amount'] for _, g in test_df.groupby('weekday')]
+    f_stat, p_value, n_weekday_groups = anova_by_code('weekday')
     
-    if len(weekday_groups) >= 2 and all(len(group) > 0 for group in weekday_groups):
-        f_stat, p_value = f_oneway(*weekday_groups)
+    if n_weekday_groups >= 2:
         st.markdown(f"""
         **Total Amount by Weekday**
         - F-statistic: {f_stat:.2f}
@@ -357,13 +544,12 @@ with tab3:
         - {'Significant difference' if p_value < 0.05 else 'No significant difference'} between weekdays
         """)
     else:
-        st.warning(f"Cannot perform ANOVA test on weekdays - need at least 2 weekdays with data (found {len(weekday_groups)})")
+        st.warning(f"Cannot perform ANOVA test on weekdays - need at least 2 weekdays with data (found {n_weekday_groups})")
     
     # New ANOVA test: total_amount ~ week_of_month
-    week_groups = [g['total_amount'] for _, g in test_df.groupby('week_name')]
+    f_stat, p_value, n_week_groups = anova_by_code('week_name')
     
-    if len(week_groups) >= 2 and all(len(group) > 0 for group in week_groups):
-        f_stat, p_value = f_oneway(*week_groups)
+    if n_week_groups >= 2:
         st.markdown(f"""
         **Total Amount by Week of Month**
         - F-statistic: {f_stat:.2f}
@@ -371,7 +557,7 @@ with tab3:
         - {'Significant difference' if p_value < 0.05 else 'No significant difference'} between weeks of the month
         """)
     else:
-        st.warning(f"Cannot perform ANOVA test on weeks - need at least 2 weeks with data (found {len(week_groups)})")
+        st.warning(f"Cannot perform ANOVA test on weeks - need at least 2 weeks with data (found {n_week_groups})")
     
     # Chi-square test
     if 'trip_type_name' in test_df.columns:
@@ -380,7 +566,22 @@ with tab3:
         This test examines the association between trip type and payment type.
         """)
         
-        contingency = pd.crosstab(test_df['trip_type_name'], test_df['payment_type_name'])
+        # Contingency table in one pass over the category codes - no hash
+        # table or MultiIndex machinery like pd.crosstab; -1 codes (nulls)
+        # are excluded and empty rows/columns dropped to match crosstab
+        a = test_df['trip_type_name'].cat.codes.to_numpy()
+        b = test_df['payment_type_name'].cat.codes.to_numpy()
+        valid = (a >= 0) & (b >= 0)
+        counts = np.zeros((test_df['trip_type_name'].cat.categories.size,
+                           test_df['payment_type_name'].cat.categories.size), dtype=np.int64)
+        np.add.at(counts, (a[valid], b[valid]), 1)
+        row_mask = counts.any(axis=1)
+        col_mask = counts.any(axis=0)
+        contingency = pd.DataFrame(
+            counts[np.ix_(row_mask, col_mask)],
+            index=test_df['trip_type_name'].cat.categories[row_mask],
+            columns=test_df['payment_type_name'].cat.categories[col_mask]
+        )
         
         if contingency.shape[0] >= 2 and contingency.shape[1] >= 2:
             chi2, p, _, _ = chi2_contingency(contingency)
@@ -398,14 +599,21 @@ with tab4:
     st.subheader("Raw Data Preview")
     st.dataframe(filtered_df.head(100))
     
-    # Download button
-    csv = filtered_df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="Download Filtered Data as CSV",
-        data=csv,
-        file_name="filtered_green_taxi_data.csv",
-        mime="text/csv"
-    )
+    # Download button - the CSV is only serialized once the user asks for it,
+    # through pyarrow's multithreaded C++ writer rather than pandas' to_csv
+    # running on every rerun
+    if st.button("Prepare CSV"):
+        import io
+        import pyarrow.csv as pa_csv
+
+        buf = io.BytesIO()
+        pa_csv.write_csv(pa.Table.from_pandas(filtered_df, preserve_index=False), buf)
+        st.download_button(
+            label="Download Filtered Data as CSV",
+            data=buf.getvalue(),
+            file_name="filtered_green_taxi_data.csv",
+            mime="text/csv"
+        )
 
 # Footer
 st.markdown("---")